@@ -1,64 +1,118 @@
 from __future__ import annotations
 from typing import List, Any, AsyncIterator, Tuple
 import os
+import time
 
 from ..types import ApiClient, ChatMessage
-from ..utils import Result, ok, err
+from ..utils import Result, ok, err, CONFIG_CHECK_TTL_S
 from ..settings import Settings
 
 
-import dotenv
 # SDK: pip/uv add google-genai
 from google import genai  # type: ignore
 from google.genai import types as gtypes  # type: ignore
 
-dotenv.load_dotenv()
+_GEMINI_ROLES = {"user": "user", "assistant": "model"}
+_GENERIC_STOPS = ("\n\n", "\n- ", "\n1. ")
+# One SDK client (and its HTTP session) per API key, shared by all GeminiClient instances
+_SDK_CLIENTS: dict[str, Any] = {}
 
 def _extract_gemini_text(resp: Any) -> str:
     # 1) Fast path
-    text = getattr(resp, "text", None)
-    if isinstance(text, str) and text.strip():
+    try:
+        text = resp.text
+    except AttributeError:
+        text = None
+    if isinstance(text, str) and text and not text.isspace():
         return text
 
-    # 2) Candidates/parts path
-    candidates = getattr(resp, "candidates", None) or []
-    for c in candidates:
-        content = getattr(c, "content", None)
-        parts = getattr(content, "parts", None) or []
-        buf = []
-        for p in parts:
-            t = getattr(p, "text", None)
-            if isinstance(t, str):
-                buf.append(t)
-        s = "".join(buf).strip()
-        if s:
+    # 2) Candidates/parts path (caller strips the final text)
+    try:
+        candidates = resp.candidates
+    except AttributeError:
+        return ""
+    for c in candidates or ():
+        try:
+            s = "".join([p.text for p in c.content.parts if isinstance(p.text, str)])
+        except (AttributeError, TypeError):  # missing content/parts on this candidate
+            continue
+        if s and not s.isspace():
             return s
 
     # 3) Nothing usable
     return ""
 
 def _to_contents(messages: List[ChatMessage]) -> Tuple[str, list[Any]]:
-    """Convert chat-style messages into Gemini contents and system instruction."""
-    system_texts: list[str] = []
+    """Convert chat-style messages into Gemini contents and system instruction (single pass)."""
+    system_instruction = ""
     contents: list[Any] = []
     for m in messages:
-        if m.role == "system":
-            if m.content:
-                system_texts.append(m.content)
-        elif m.role == "user":
-            contents.append(gtypes.Content(role="user", parts=[gtypes.Part(text=m.content or "")]))
-        else:  # assistant
-            contents.append(gtypes.Content(role="model", parts=[gtypes.Part(text=m.content or "")]))
-    system_instruction = "\n\n".join(system_texts).strip()
-    return system_instruction, contents
+        role, text = m.role, m.content or ""
+        if role == "system":
+            # Usually exactly one system message: no intermediate list/join needed
+            if text:
+                system_instruction = f"{system_instruction}\n\n{text}" if system_instruction else text
+        else:
+            # Dict form (ContentDict): the SDK validates it once while building the request
+            contents.append({"role": _GEMINI_ROLES.get(role, "model"), "parts": [{"text": text}]})
+    return system_instruction.strip(), contents
+
+
+def _split_prompt(user_content: str) -> Tuple[str, str] | None:
+    """Locate prefix/suffix in a rendered user message using index scans only.
+
+    Prefers the <prefix/>/<suffix/> markers of the default template and falls
+    back to splitting around <mask/> (legacy template).
+    """
+    i1 = user_content.find("<prefix/>\n")
+    if i1 != -1:
+        i2 = user_content.find("\n</prefix/>", i1 + 10)
+        i3 = user_content.find("<suffix/>\n", i2) if i2 != -1 else -1
+        i4 = user_content.find("\n</suffix/>", i3 + 10) if i3 != -1 else -1
+        if i4 != -1:
+            return user_content[i1 + 10:i2], user_content[i3 + 10:i4]
+    m1 = user_content.find("<mask/>")
+    if m1 == -1:
+        return None
+    m2 = user_content.find("<mask/>", m1 + 7)
+    return user_content[:m1], user_content[m1 + 7:m2 if m2 != -1 else None]
+
+
+def _last_user_content(messages: List[ChatMessage]) -> str:
+    """Return the content of the last user message (one indexed scan from the end)."""
+    for i in range(len(messages) - 1, -1, -1):
+        m = messages[i]
+        if m.role == "user":
+            return m.content or ""
+    return ""
+
+
+def _sdk_client_for(api_key: str) -> Any:
+    client = _SDK_CLIENTS.get(api_key)
+    if client is None:
+        client = _SDK_CLIENTS[api_key] = genai.Client(api_key=api_key)
+    return client
 
 
 class GeminiClient(ApiClient):
     def __init__(self, key: str, model: str, model_options):
         api_key = key or os.getenv("GOOGLE_API_KEY", "")
-        self.client = genai.Client(api_key=api_key)
+        self.client = _sdk_client_for(api_key)
         self.model = model
         self.model_options = model_options
+        self._config_ok_until = 0.0
+        # Options are fixed per client; per-call fields are filled in with model_copy(update=...)
+        self._cfg_base = gtypes.GenerateContentConfig(
+            temperature=min(model_options.temperature, 0.4),
+            top_p=model_options.top_p,
+            presence_penalty=model_options.presence_penalty,
+            frequency_penalty=model_options.frequency_penalty,
+            candidate_count=1,
+        )
+        self._stream_cfg_base = self._cfg_base.model_copy(update={
+            "temperature": model_options.temperature,
+            "max_output_tokens": model_options.max_tokens,
+        })
 
     @classmethod
     def from_settings(cls, s: Settings) -> "GeminiClient":
@@ -75,56 +129,33 @@ class GeminiClient(ApiClient):
                 return min(max(base_cap, 160), max(floor, need))
 
             # Try to extract prefix/suffix from the last user message content
-            user_content = ""
-            for m in reversed(messages):
-                if m.role == "user":
-                    user_content = m.content or ""
-                    break
+            user_content = _last_user_content(messages)
             max_tok = min(self.model_options.max_tokens, 192)
             sfx_for_stops = ""
-            try:
-                if "<prefix/>" in user_content and "</prefix/>" in user_content and "<suffix/>" in user_content and "</suffix/>" in user_content:
-                    pfx = user_content.split("<prefix/>\n", 1)[1].split("\n</prefix/>", 1)[0]
-                    sfx = user_content.split("<suffix/>\n", 1)[1].split("\n</suffix/>", 1)[0]
-                    max_tok = _target_tokens(pfx, sfx, min(self.model_options.max_tokens, 192))
-                    sfx_for_stops = sfx
-                elif "<mask/>" in user_content:
-                    # Fallback heuristic: split around mask for legacy template
-                    parts = user_content.split("<mask/>")
-                    pfx = parts[0]
-                    sfx = parts[1] if len(parts) > 1 else ""
-                    max_tok = _target_tokens(pfx, sfx, min(self.model_options.max_tokens, 192))
-                    sfx_for_stops = sfx
-            except Exception:
-                pass
+            split = _split_prompt(user_content)
+            if split is not None:
+                pfx, sfx = split
+                max_tok = _target_tokens(pfx, sfx, min(self.model_options.max_tokens, 192))
+                sfx_for_stops = sfx
 
             # Build stop sequences: suffix head + generic boundaries
+            # Only when there is a non-blank suffix; otherwise generation runs to max_tok
             stop: list[str] = []
-            try:
-                head16 = (sfx_for_stops or "")[:16].strip()
-                head8  = (sfx_for_stops or "")[:8].strip()
-                for h in (head16, head8):
+            if sfx_for_stops and not sfx_for_stops.isspace():
+                head16 = sfx_for_stops[:16]
+                for h in (head16.strip(), head16[:8].strip()):
                     if len(h) >= 2:
                         stop.append(h)
-            except Exception:
-                pass
-            # Only add generic stops when there is a suffix
-            if (sfx_for_stops or "").strip():
-                stop.extend(["\n\n", "\n- ", "\n1. "])
+                stop.extend(_GENERIC_STOPS)
 
             resp = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=contents if contents else (messages[-1].content if messages else ""),
-                config=gtypes.GenerateContentConfig(
-                    temperature=min(self.model_options.temperature, 0.4),
-                    top_p=self.model_options.top_p,
-                    presence_penalty=self.model_options.presence_penalty,
-                    frequency_penalty=self.model_options.frequency_penalty,
-                    max_output_tokens=max_tok,
-                    candidate_count=1,
-                    system_instruction=system_instruction or None,
-                    stop_sequences=stop,
-                ),
+                config=self._cfg_base.model_copy(update={
+                    "max_output_tokens": max_tok,
+                    "system_instruction": system_instruction or None,
+                    "stop_sequences": stop,
+                }),
             )
             text = _extract_gemini_text(resp)
             if text is None or text.strip() == "":
@@ -139,15 +170,7 @@ class GeminiClient(ApiClient):
             stream = await self.client.aio.models.generate_content_stream(
                 model=self.model,
                 contents=contents if contents else (messages[-1].content if messages else ""),
-                config=gtypes.GenerateContentConfig(
-                    temperature=self.model_options.temperature,
-                    top_p=self.model_options.top_p,
-                    presence_penalty=self.model_options.presence_penalty,
-                    frequency_penalty=self.model_options.frequency_penalty,
-                    max_output_tokens=self.model_options.max_tokens,
-                    candidate_count=1,
-                    system_instruction=system_instruction or None,
-                ),
+                config=self._stream_cfg_base.model_copy(update={"system_instruction": system_instruction or None}),
             )
             async for chunk in stream:
                 text = getattr(chunk, "text", None)
@@ -169,7 +192,12 @@ class GeminiClient(ApiClient):
             errors.append(str(e))
         if errors:
             return errors
+        if time.monotonic() < self._config_ok_until:
+            return []
         res = await self.query_chat_model([ChatMessage(role="user", content="Say hello world and nothing else.")])
-        return [] if res.is_ok() else [str(res.error)]
+        if res.is_err():
+            return [str(res.error)]
+        self._config_ok_until = time.monotonic() + CONFIG_CHECK_TTL_S
+        return []
 
 
@@ -1,39 +1,39 @@
 from __future__ import annotations
 from typing import List
 from ..types import ApiClient, ChatMessage
-from ..utils import make_api_request, Result, ok, err, get_http_client
-import json
+from ..utils import make_api_request, Result, ok, err, get_http_client, json_dumps, json_loads, aiter_sse_data, CONFIG_CHECK_TTL_S
+import time
 from ..settings import Settings
 
 
+_SSE_DONE = frozenset((b"[DONE]", b"done", b"null"))
+
+
 def _to_input_items(messages: List[ChatMessage]) -> list[dict]:
-    items = []
-    for m in messages:
-        items.append({
-            "role": m.role,
-            "content": [{"type": "input_text", "text": m.content}],
-        })
-    return items
+    return [{"role": m.role, "content": [{"type": "input_text", "text": m.content}]} for m in messages]
 
 
 def _extract_output_text(payload: dict) -> str:
     # Prefer aggregated field if present
-    if isinstance(payload.get("output_text"), str):
-        return payload["output_text"]
+    text = payload.get("output_text")
+    if isinstance(text, str):
+        return text
 
-    out = payload.get("output", []) or []
     texts: list[str] = []
-    for item in out:
-        if item.get("type") == "output_text" and "text" in item:
-            texts.append(item["text"])
-        if item.get("type") == "message":
-            for c in item.get("content", []) or []:
-                if isinstance(c, dict) and "text" in c:
-                    texts.append(c["text"])
-    if not texts and "content" in payload:
-        for c in payload["content"]:
-            if isinstance(c, dict) and c.get("type") == "output_text":
-                texts.append(c.get("text", ""))
+    out = payload.get("output")
+    if out:
+        for item in out:
+            kind = item.get("type")
+            if kind == "output_text" and "text" in item:
+                texts.append(item["text"])
+            elif kind == "message":
+                content = item.get("content")
+                if content:
+                    texts.extend(c["text"] for c in content if isinstance(c, dict) and "text" in c)
+    if not texts:
+        content = payload.get("content")
+        if content:
+            texts.extend(c.get("text", "") for c in content if isinstance(c, dict) and c.get("type") == "output_text")
     return "".join(texts)
 
 
@@ -43,16 +43,18 @@ class OpenAIClient(ApiClient):
         self.url = url
         self.model = model
         self.model_options = model_options
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        }
+        self._stream_headers = {**self._headers, "Accept": "text/event-stream"}
+        self._config_ok_until = 0.0
 
     @classmethod
     def from_settings(cls, s: Settings) -> "OpenAIClient":
         return cls(s.openai.key, s.openai.url, s.openai.model, s.model_options)
 
     async def query_chat_model(self, messages: List[ChatMessage]) -> Result[str]:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
         body = {
             "model": self.model,
             "input": _to_input_items(messages),
@@ -62,7 +64,7 @@ class OpenAIClient(ApiClient):
             "presence_penalty": self.model_options.presence_penalty,
             "max_output_tokens": self.model_options.max_tokens,
         }
-        data = await make_api_request(self.url, "POST", body, headers)
+        data = await make_api_request(self.url, "POST", json_dumps(body), self._headers)
         if data.is_err(): return data
         try:
             content = _extract_output_text(data.value)
@@ -71,11 +73,6 @@ class OpenAIClient(ApiClient):
             return err(e)
 
     async def stream_chat_model(self, messages: List[ChatMessage]):
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "Accept": "text/event-stream",
-        }
         body = {
             "model": self.model,
             "input": _to_input_items(messages),
@@ -86,42 +83,40 @@ class OpenAIClient(ApiClient):
             "stream": True,
         }
         client = await get_http_client()
-        async with client.stream("POST", self.url, json=body, headers=headers) as resp:
+        async with client.stream("POST", self.url, content=json_dumps(body), headers=self._stream_headers) as resp:
             if resp.status_code >= 400:
                 # terminate stream on error
                 return
-            async for raw_line in resp.aiter_lines():
-                if not raw_line:
+            async for data in aiter_sse_data(resp):
+                if data in _SSE_DONE:
+                    break
+                try:
+                    obj = json_loads(data)
+                except Exception:
                     continue
-                if raw_line.startswith("data: "):
-                    data = raw_line[6:].strip()
-                    if data in ("[DONE]", "done", "null"):
-                        break
-                    try:
-                        obj = json.loads(data)
-                    except Exception:
-                        continue
-                    t = obj.get("type") or obj.get("event")
-                    if t in ("response.output_text.delta", "output_text.delta"):
-                        delta = obj.get("delta")
-                        if isinstance(delta, dict) and isinstance(delta.get("text"), str):
-                            yield delta["text"]
-                        elif isinstance(obj.get("output_text"), str):
-                            yield obj["output_text"]
-                    elif t == "message":
-                        for c in obj.get("content", []) or []:
-                            if isinstance(c, dict) and isinstance(c.get("text"), str):
-                                yield c["text"]
-                    elif t in ("response.completed", "error"):
-                        break
+                t = obj.get("type") or obj.get("event")
+                if t in ("response.output_text.delta", "output_text.delta"):
+                    delta = obj.get("delta")
+                    if isinstance(delta, dict) and isinstance(delta.get("text"), str):
+                        yield delta["text"]
+                    elif isinstance(obj.get("output_text"), str):
+                        yield obj["output_text"]
+                elif t == "message":
+                    for c in obj.get("content", []) or []:
+                        if isinstance(c, dict) and isinstance(c.get("text"), str):
+                            yield c["text"]
+                elif t in ("response.completed", "error"):
+                    break
 
     async def check_config(self) -> list[str]:
         errors: list[str] = []
         if not self.url: errors.append("OpenAI Responses API url is not set")
         if not self.api_key: errors.append("OpenAI API key is not set")
         if errors: return errors
+        if time.monotonic() < self._config_ok_until: return []
         res = await self.query_chat_model([ChatMessage(role="user", content="Say hello world and nothing else.")])
         if res.is_err(): errors.append(str(res.error))
+        else: self._config_ok_until = time.monotonic() + CONFIG_CHECK_TTL_S
         return errors
 
 
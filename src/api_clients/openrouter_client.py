@@ -1,11 +1,15 @@
 from __future__ import annotations
 from typing import List
 from ..types import ApiClient, ChatMessage
-from ..utils import make_api_request, Result, ok, err, get_http_client
-import json
+from ..utils import make_api_request, Result, ok, err, get_http_client, json_dumps, json_loads, aiter_sse_data, CONFIG_CHECK_TTL_S
+import time
 from ..settings import Settings
 
 
+def _to_chat_messages(messages: List[ChatMessage]) -> list[dict]:
+    return [{"role": m.role, "content": m.content} for m in messages]
+
+
 class OpenRouterClient(ApiClient):
     def __init__(self, key: str, url: str, model: str, model_options, site_url: str | None, app_title: str | None):
         self.key = key
@@ -14,6 +18,16 @@ class OpenRouterClient(ApiClient):
         self.model_options = model_options
         self.site_url = site_url
         self.app_title = app_title
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}",
+        }
+        if site_url:
+            self._headers["HTTP-Referer"] = site_url
+        if app_title:
+            self._headers["X-Title"] = app_title
+        self._stream_headers = {**self._headers, "Accept": "text/event-stream"}
+        self._config_ok_until = 0.0
 
     @classmethod
     def from_settings(cls, s: Settings) -> "OpenRouterClient":
@@ -23,18 +37,9 @@ class OpenRouterClient(ApiClient):
         )
 
     async def query_chat_model(self, messages: List[ChatMessage]) -> Result[str]:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.key}",
-        }
-        if self.site_url:
-            headers["HTTP-Referer"] = self.site_url
-        if self.app_title:
-            headers["X-Title"] = self.app_title
-
         body = {
             "model": self.model,
-            "messages": [m.model_dump() for m in messages],
+            "messages": _to_chat_messages(messages),
             "stream": False,
             "temperature": self.model_options.temperature,
             "top_p": self.model_options.top_p,
@@ -42,7 +47,7 @@ class OpenRouterClient(ApiClient):
             "presence_penalty": self.model_options.presence_penalty,
             "max_tokens": self.model_options.max_tokens,
         }
-        data = await make_api_request(self.url, "POST", body, headers)
+        data = await make_api_request(self.url, "POST", json_dumps(body), self._headers)
         if data.is_err():
             return data
         try:
@@ -51,19 +56,9 @@ class OpenRouterClient(ApiClient):
             return err(e)
 
     async def stream_chat_model(self, messages: List[ChatMessage]):
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.key}",
-            "Accept": "text/event-stream",
-        }
-        if self.site_url:
-            headers["HTTP-Referer"] = self.site_url
-        if self.app_title:
-            headers["X-Title"] = self.app_title
-
         body = {
             "model": self.model,
-            "messages": [m.model_dump() for m in messages],
+            "messages": _to_chat_messages(messages),
             "stream": True,
             "temperature": self.model_options.temperature,
             "top_p": self.model_options.top_p,
@@ -71,26 +66,22 @@ class OpenRouterClient(ApiClient):
             "presence_penalty": self.model_options.presence_penalty,
         }
         client = await get_http_client()
-        async with client.stream("POST", self.url, json=body, headers=headers) as resp:
+        async with client.stream("POST", self.url, content=json_dumps(body), headers=self._stream_headers) as resp:
             if resp.status_code >= 400:
                 return
-            async for raw_line in resp.aiter_lines():
-                if not raw_line:
+            async for data in aiter_sse_data(resp):
+                if data == b"[DONE]":
+                    break
+                try:
+                    obj = json_loads(data)
+                except Exception:
                     continue
-                if raw_line.startswith("data: "):
-                    data = raw_line[6:].strip()
-                    if data == "[DONE]":
-                        break
-                    try:
-                        obj = json.loads(data)
-                    except Exception:
-                        continue
-                    try:
-                        delta = obj["choices"][0]["delta"].get("content", "")
-                    except Exception:
-                        delta = ""
-                    if delta:
-                        yield delta
+                try:
+                    delta = obj["choices"][0]["delta"].get("content", "")
+                except Exception:
+                    delta = ""
+                if delta:
+                    yield delta
 
     async def check_config(self) -> list[str]:
         errors: list[str] = []
@@ -100,9 +91,13 @@ class OpenRouterClient(ApiClient):
             errors.append("OpenRouter API key is not set")
         if errors:
             return errors
+        if time.monotonic() < self._config_ok_until:
+            return []
         res = await self.query_chat_model([ChatMessage(role="user", content="Say hello world and nothing else.")])
         if res.is_err():
             errors.append(str(res.error))
+        else:
+            self._config_ok_until = time.monotonic() + CONFIG_CHECK_TTL_S
         return errors
 
 
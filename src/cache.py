@@ -1,25 +1,56 @@
 from __future__ import annotations
 import time
-try:
-    from cachetools import TTLCache  # type: ignore
-    suggest_cache = TTLCache(maxsize=512, ttl=20)
-except Exception:
-    class _SimpleTTL:
-        def __init__(self, ttl: int = 20):
-            self.ttl = ttl
-            self._d = {}
-        def __setitem__(self, k, v):
-            self._d[k] = (v, time.time() + self.ttl)
-        def get(self, k, default=None):
-            v = self._d.get(k, None)
-            if not v: return default
-            val, exp = v
-            if time.time() > exp:
-                self._d.pop(k, None)
-                return default
-            return val
-        def __contains__(self, k):
-            return self.get(k) is not None
-    suggest_cache = _SimpleTTL(20)
+from collections import OrderedDict
+from typing import Any, Hashable
 
+_MISSING = object()
 
+
+class LRUTTLCache:
+    """
+    Bounded LRU cache whose entries expire ``ttl`` seconds after insertion.
+    Expiry uses the monotonic clock and is checked lazily on access.
+
+    Operations never await, so each one runs atomically on the event loop:
+    concurrent requests cannot contend on it and no lock or sharding is needed.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 20) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._d: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, k: Hashable, default: Any = None) -> Any:
+        entry = self._d.get(k)
+        if entry is None:
+            return default
+        val, deadline = entry
+        if time.monotonic() > deadline:
+            del self._d[k]
+            return default
+        self._d.move_to_end(k)
+        return val
+
+    def __getitem__(self, k: Hashable) -> Any:
+        entry = self.get(k, _MISSING)
+        if entry is _MISSING:
+            raise KeyError(k)
+        return entry
+
+    def __setitem__(self, k: Hashable, v: Any) -> None:
+        d = self._d
+        d[k] = (v, time.monotonic() + self.ttl)
+        d.move_to_end(k)
+        while len(d) > self.maxsize:
+            d.popitem(last=False)
+
+    def __contains__(self, k: Hashable) -> bool:
+        return self.get(k) is not None
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+
+suggest_cache = LRUTTLCache(maxsize=512, ttl=20)
+# Keys whose upstream call succeeded with no suggestion; kept briefly to skip re-asking
+suggest_cache_neg = LRUTTLCache(maxsize=512, ttl=10)
@@ -1,18 +1,16 @@
 from __future__ import annotations
 import re
 from enum import Enum
-from .utils import generate_random_string
 
-UNIQUE_CURSOR = generate_random_string(16)
-HEADER_REGEX = rf"^#+\s.*{UNIQUE_CURSOR}.*$"
-UNORDERED_LIST_REGEX = rf"^\s*(-|\*)\s.*{UNIQUE_CURSOR}.*$"
-TASK_LIST_REGEX = rf"^\s*(-|[0-9]+\.) +\[.\]\s.*{UNIQUE_CURSOR}.*$"
-BLOCK_QUOTES_REGEX = rf"^\s*>.*{UNIQUE_CURSOR}.*$"
-NUMBERED_LIST_REGEX = rf"^\s*\d+\.\s.*{UNIQUE_CURSOR}.*$"
+# Line markers, matched against the part of the cursor's line before the cursor
+HEADER_REGEX = re.compile(r"#+\s")
+TASK_LIST_REGEX = re.compile(r"\s*(-|[0-9]+\.) +\[.\]\s")
+NUMBERED_LIST_REGEX = re.compile(r"\s*\d+\.\s")
 MATH_BLOCK_REGEX = re.compile(r"\$\$[\s\S]*?\$\$", re.M)
-INLINE_MATH_BLOCK_REGEX = re.compile(r"\$[\s\S]*?\$", re.M)
+# Inline spans stay on one line and exclude their own delimiter: linear scan, no backtracking
+INLINE_MATH_BLOCK_REGEX = re.compile(r"\$[^$\n]+\$")
 CODE_BLOCK_REGEX = re.compile(r"```[\s\S]*?```", re.M)
-INLINE_CODE_BLOCK_REGEX = re.compile(r"`.*`", re.M)
+INLINE_CODE_BLOCK_REGEX = re.compile(r"`[^`\n]*`")
 
 
 class Context(str, Enum):
@@ -26,31 +24,38 @@ class Context(str, Enum):
     TaskList = "TaskList"
 
 
-def _is_cursor_in_regex_block(prefix: str, suffix: str, pattern: re.Pattern) -> bool:
-    text = prefix + UNIQUE_CURSOR + suffix
-    blocks = pattern.findall(text)
-    for b in blocks:
-        if UNIQUE_CURSOR in (b if isinstance(b, str) else "".join(b)):
+def _is_cursor_in_regex_block(text: str, cur: int, pattern: re.Pattern, lo: int = 0, hi: int = -1) -> bool:
+    # ``text`` has a single NUL at offset ``cur`` marking the cursor, so delimiters on either side stay apart.
+    # ``lo``/``hi`` restrict matching to a window of ``text`` without slicing it.
+    for m in pattern.finditer(text, lo, hi if hi != -1 else len(text)):
+        if m.start() > cur:
+            break
+        if m.end() > cur:
             return True
     return False
 
 
 def get_context(prefix: str, suffix: str) -> Context:
-    text = prefix + UNIQUE_CURSOR + suffix
-    if re.search(HEADER_REGEX, text, re.M):
+    # Line markers must sit before the cursor on its own line, so only that slice is inspected.
+    # Fenced/$$ blocks pair delimiters from the start of the document and still need the full text.
+    line_prefix = prefix[prefix.rfind("\n") + 1:]
+    stripped = line_prefix.lstrip()
+    if HEADER_REGEX.match(line_prefix):
         return Context.Heading
-    if re.search(BLOCK_QUOTES_REGEX, text, re.M):
+    if stripped.startswith(">"):
         return Context.BlockQuotes
-    if re.search(TASK_LIST_REGEX, text, re.M):
+    if TASK_LIST_REGEX.match(line_prefix):
         return Context.TaskList
-    if _is_cursor_in_regex_block(prefix, suffix, MATH_BLOCK_REGEX) or _is_cursor_in_regex_block(prefix, suffix, INLINE_MATH_BLOCK_REGEX):
+    # Built once and shared by the block matchers below
+    text, cur = prefix + "\0" + suffix, len(prefix)
+    if _is_cursor_in_regex_block(text, cur, MATH_BLOCK_REGEX) or _is_cursor_in_regex_block(text, cur, INLINE_MATH_BLOCK_REGEX):
         return Context.MathBlock
-    if _is_cursor_in_regex_block(prefix, suffix, CODE_BLOCK_REGEX) or _is_cursor_in_regex_block(prefix, suffix, INLINE_CODE_BLOCK_REGEX):
+    if _is_cursor_in_regex_block(text, cur, CODE_BLOCK_REGEX):
         return Context.CodeBlock
-    if re.search(NUMBERED_LIST_REGEX, text, re.M):
+    if _is_cursor_in_regex_block(text, cur, INLINE_CODE_BLOCK_REGEX, cur - len(line_prefix), text.find("\n", cur)):
+        return Context.CodeBlock
+    if NUMBERED_LIST_REGEX.match(line_prefix):
         return Context.NumberedList
-    if re.search(UNORDERED_LIST_REGEX, text, re.M):
+    if stripped[:1] in ("-", "*") and stripped[1:2].isspace():
         return Context.UnorderedList
     return Context.Text
-
-
@@ -1,18 +1,29 @@
 from __future__ import annotations
 import asyncio
-from typing import Dict, Tuple, Callable, Awaitable, List
+from typing import Dict, Set, Tuple, Callable, Awaitable
 
 
 class LatestOnly:
     """
     Ensure at most one task per user runs at a time, always processing the latest
     scheduled (prefix, suffix). Intermediate states are dropped.
+
+    Each user has a single pending slot: the newest input and the future its caller
+    awaits. Scheduling over a pending input resolves the older future with the newer
+    one, so superseded callers follow the chain and receive the latest result.
+
+    Cancelling a caller never completes a shared future: it only withdraws that
+    caller's interest in the pending input, which is dropped once nobody wants it.
+    If the caller that is draining is cancelled, its in-flight input is handed back
+    and one of the remaining callers takes over the drain.
     """
 
     def __init__(self) -> None:
-        self._locks: Dict[str, asyncio.Lock] = {}
+        self._running: Set[str] = set()
         self._latest: Dict[str, Tuple[str, str]] = {}
-        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Live callers whose chain currently ends at the pending future
+        self._wanted: Dict[str, int] = {}
 
     async def run(
         self,
@@ -21,35 +32,81 @@ class LatestOnly:
         suffix: str,
         fn: Callable[[str, str], Awaitable[str]],
     ) -> str:
-        loop = asyncio.get_event_loop()
-        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        prev = self._pending.get(user_id)
+        if prev is not None:
+            prev.set_result(fut)
         self._latest[user_id] = (prefix, suffix)
+        self._pending[user_id] = fut
+        self._wanted[user_id] = self._wanted.get(user_id, 0) + 1
+
+        try:
+            return await self._follow(user_id, fut, fn)
+        except asyncio.CancelledError:
+            self._abandon(user_id, fut)
+            raise
+
+    async def _follow(
+        self, user_id: str, fut: asyncio.Future, fn: Callable[[str, str], Awaitable[str]]
+    ) -> str:
+        while True:
+            if user_id not in self._running and user_id in self._latest:
+                self._running.add(user_id)
+                try:
+                    await self._drain(user_id, fn)
+                finally:
+                    self._running.discard(user_id)
+            # Shield: the future is shared with other callers, our cancellation isn't theirs
+            result = await asyncio.shield(fut)
+            if not isinstance(result, asyncio.Future):
+                return result
+            fut = result
 
-        # Register a waiter for the result of the next completed run
-        fut: asyncio.Future = loop.create_future()
-        self._waiters.setdefault(user_id, []).append(fut)
-
-        if lock.locked():
-            # Another request is running; wait for its completion to deliver latest result
-            return await fut
-
-        async with lock:
-            result: str = ""
-            while True:
-                p, s = self._latest.pop(user_id, (None, None))  # type: ignore[assignment]
-                if p is None or s is None:
-                    break
-                result = await fn(p, s)
-                # Resolve all waiters with the produced result
-                waiters = self._waiters.pop(user_id, [])
-                for w in waiters:
-                    if not w.done():
-                        w.set_result(result)
-                if user_id not in self._latest:
-                    break
-            # Ensure the waiter created for the starter of this run is resolved
-            if not fut.done():
-                fut.set_result(result)
-            return result
+    async def _drain(self, user_id: str, fn: Callable[[str, str], Awaitable[str]]) -> None:
+        while True:
+            inp = self._latest.pop(user_id, None)
+            if inp is None:
+                return
+            cur = self._pending.pop(user_id)
+            wanted = self._wanted.pop(user_id, 0)
+            try:
+                result = await fn(*inp)
+            except asyncio.CancelledError:
+                self._hand_off(user_id, inp, cur, wanted)
+                raise
+            except Exception as e:
+                cur.set_exception(e)
+                cur.exception()  # mark retrieved: its waiters may all have been cancelled
+                continue
+            cur.set_result(result)
 
+    def _hand_off(
+        self, user_id: str, inp: Tuple[str, str], cur: asyncio.Future, wanted: int
+    ) -> None:
+        # The drainer is going away mid-call. Requeue its input unless a newer one is
+        # pending, and move every waiter onto a fresh future so they wake up and one of
+        # them picks the drain back up.
+        nxt = cur.get_loop().create_future()
+        prev = self._pending.get(user_id)
+        if prev is None:
+            self._latest[user_id] = inp
+        else:
+            prev.set_result(nxt)
+        self._pending[user_id] = nxt
+        self._wanted[user_id] = self._wanted.get(user_id, 0) + wanted
+        cur.set_result(nxt)
 
+    def _abandon(self, user_id: str, fut: asyncio.Future) -> None:
+        end = fut
+        while end.done() and end.exception() is None and isinstance(end.result(), asyncio.Future):
+            end = end.result()
+        if self._pending.get(user_id) is not end:
+            return  # already running or finished; nothing left to withdraw
+        left = self._wanted.get(user_id, 0) - 1
+        if left > 0:
+            self._wanted[user_id] = left
+            return
+        # Nobody is waiting for the pending input any more: don't spend an upstream call
+        self._wanted.pop(user_id, None)
+        self._pending.pop(user_id, None)
+        self._latest.pop(user_id, None)
@@ -2,13 +2,14 @@ from __future__ import annotations
 import re
 from ..context_detection import Context
 
+_FENCE_OPEN = re.compile(r"```[a-zA-Z]+[ \t]*\n?")
+_FENCE_CLOSE = re.compile(r"\n?```[ \t]*\n?")
+
 
 class RemoveCodeIndicators:
     def process(self, prefix: str, suffix: str, completion: str, context: Context) -> str:
         if context == Context.CodeBlock:
-            completion = re.sub(r"```[a-zA-Z]+[ \t]*\n?", "", completion)
-            completion = re.sub(r"\n?```[ \t]*\n?", "", completion)
+            completion = _FENCE_OPEN.sub("", completion)
+            completion = _FENCE_CLOSE.sub("", completion)
             completion = completion.replace("`", "")
         return completion
-
-
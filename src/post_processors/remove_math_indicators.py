@@ -2,12 +2,12 @@ from __future__ import annotations
 import re
 from ..context_detection import Context
 
+_DOLLAR_BLOCK = re.compile(r"\n?\$\$\n?")
+
 
 class RemoveMathIndicators:
     def process(self, prefix: str, suffix: str, completion: str, context: Context) -> str:
         if context == Context.MathBlock:
-            completion = re.sub(r"\n?\$\$\n?", "", completion)
+            completion = _DOLLAR_BLOCK.sub("", completion)
             completion = completion.replace("$", "")
         return completion
-
-
@@ -1,41 +1,30 @@
 from __future__ import annotations
+import re
 
+# A non-space char at the start of the text or right after whitespace (same set as str.isspace)
+_WORD_START = re.compile(r"(?:^|(?<=\s))\S")
 
-def _is_ws(ch: str | None) -> bool:
-    return ch is not None and (ch.isspace())
 
-
-def _start_locations(text: str) -> list[int]:
-    locs: list[int] = []
-    if text and not _is_ws(text[0]):
-        locs.append(0)
-    for i in range(1, len(text)):
-        if _is_ws(text[i - 1]) and not _is_ws(text[i]):
-            locs.append(i)
-    return locs
-
-
-def _remove_leading_ws(completion: str) -> str:
-    i = 0
-    while i < len(completion) and completion[i].isspace():
-        i += 1
-    return completion[i:]
+def _start_locations(text: str, lo: int = 0) -> list[int]:
+    """Word-start offsets in ``text`` at or after ``lo``."""
+    return [m.start() for m in _WORD_START.finditer(text, max(lo, 0))]
 
 
 def _remove_word_overlap_prefix(prefix: str, completion: str) -> str:
     right_trimmed = completion.lstrip()
-    starts = _start_locations(prefix)
+    # A prefix tail longer than the completion can never be its prefix: only scan the last len() chars
+    starts = _start_locations(prefix, len(prefix) - len(right_trimmed))
     while starts:
         idx = starts.pop()
         left_sub = prefix[idx:]
         if right_trimmed.startswith(left_sub):
-            return right_trimmed.replace(left_sub, "", 1)
+            return right_trimmed[len(left_sub):]
     return completion
 
 
 def _remove_word_overlap_suffix(completion: str, suffix: str) -> str:
-    suffix_trimmed = _remove_leading_ws(suffix)
-    starts = _start_locations(completion)
+    suffix_trimmed = suffix.lstrip()
+    starts = _start_locations(completion, len(completion) - len(suffix_trimmed))
     while starts:
         idx = starts.pop()
         comp_sub = completion[idx:]
@@ -45,25 +34,30 @@ def _remove_word_overlap_suffix(completion: str, suffix: str) -> str:
 
 
 def _remove_ws_overlap_prefix(prefix: str, completion: str) -> str:
-    i = len(prefix) - 1
-    while completion and i >= 0 and completion[0] == prefix[i]:
-        completion = completion[1:]
-        i -= 1
-    return completion
+    # Count matches walking completion forward and prefix backward, then slice once
+    n = min(len(completion), len(prefix))
+    k = 0
+    while k < n and completion[k] == prefix[-1 - k]:
+        k += 1
+    return completion[k:] if k else completion
 
 
 def _remove_ws_overlap_suffix(completion: str, suffix: str) -> str:
-    i = 0
-    while completion and i < len(suffix) and completion[-1] == suffix[i]:
-        completion = completion[:-1]
-        i += 1
-    return completion
+    n = min(len(completion), len(suffix))
+    k = 0
+    while k < n and completion[-1 - k] == suffix[k]:
+        k += 1
+    return completion[:len(completion) - k] if k else completion
 
 
 class RemoveOverlap:
     def process(self, prefix: str, suffix: str, completion: str, context) -> str:
+        if not completion or not prefix:
+            return completion
         completion = _remove_word_overlap_prefix(prefix, completion)
-        completion = _remove_ws_overlap_prefix(prefix, completion)
+        # Common case: the first char already differs from the prefix's last char
+        if completion[:1] == prefix[-1:]:
+            completion = _remove_ws_overlap_prefix(prefix, completion)
         return completion
 
 
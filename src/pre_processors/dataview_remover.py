@@ -1,10 +1,9 @@
 from __future__ import annotations
 import re
 from pydantic import BaseModel
-from ..context_detection import UNIQUE_CURSOR
 from .types_preproc import PrefixAndSuffix
 
-DATA_VIEW_REGEX = re.compile(r"```dataview(js){0,1}(.|\n)*?```", re.M)
+DATA_VIEW_REGEX = re.compile(r"```dataview(?:js)?[\s\S]*?```")
 
 
 class _Dummy(BaseModel):
@@ -13,19 +12,16 @@ class _Dummy(BaseModel):
 
 class DataViewRemover:
     def process(self, prefix: str, suffix: str, context) -> PrefixAndSuffix:
-        text = prefix + UNIQUE_CURSOR + suffix
-        text = DATA_VIEW_REGEX.sub("", text)
-        prefix_new, suffix_new = text.split(UNIQUE_CURSOR)
-        return PrefixAndSuffix(prefix=prefix_new, suffix=suffix_new)
+        # Callers skip this when removes_cursor() is true, so every block lies wholly on one
+        # side of the cursor and each side can be cleaned on its own: no joined copy to split.
+        return PrefixAndSuffix(prefix=DATA_VIEW_REGEX.sub("", prefix), suffix=DATA_VIEW_REGEX.sub("", suffix))
 
     def removes_cursor(self, prefix: str, suffix: str) -> bool:
-        text = prefix + UNIQUE_CURSOR + suffix
-        matches = DATA_VIEW_REGEX.findall(text)
-        if not matches:
-            return False
-        for m in DATA_VIEW_REGEX.finditer(text):
-            if UNIQUE_CURSOR in text[m.start():m.end()]:
+        # One pass; a NUL marks the cursor at len(prefix) without merging delimiters around it
+        cur = len(prefix)
+        for m in DATA_VIEW_REGEX.finditer(prefix + "\0" + suffix):
+            if m.start() > cur:
+                break
+            if m.end() > cur:
                 return True
         return False
-
-
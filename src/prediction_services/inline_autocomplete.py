@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Optional
 from jinja2 import Environment, BaseLoader, StrictUndefined
 
 from ..types import PredictionService, ChatMessage
@@ -72,7 +72,8 @@ class InlineAutoCompleter(PredictionService):
         )
 
     async def fetch_predictions(self, prefix: str, suffix: str) -> Result[str]:
-        messages = self.build_messages(prefix, suffix)
+        context = get_context(prefix, suffix)
+        messages = self.build_messages(prefix, suffix, context)
         if len(messages) == 0:
             return ok("")
 
@@ -85,16 +86,20 @@ class InlineAutoCompleter(PredictionService):
             print("InlineAutoCompleter raw response:\n", result.value)
 
         result = self._extract_answer(result)
+        if result.is_err():
+            return result
 
-        # Ensure we still have context for post-processing
-        context = get_context(prefix, suffix)
+        v = result.value
         for post in self.post_processors:
-            result = result.map(lambda r: post.process(prefix, suffix, r, context))
+            v = post.process(prefix, suffix, v, context)
 
-        return self._guardrails(result)
+        return self._guardrails(ok(v))
 
-    def build_messages(self, prefix: str, suffix: str) -> List[ChatMessage]:
-        context = get_context(prefix, suffix)
+    def build_messages(
+        self, prefix: str, suffix: str, context: Optional[Context] = None
+    ) -> List[ChatMessage]:
+        if context is None:
+            context = get_context(prefix, suffix)
 
         for p in self.pre_processors:
             if getattr(p, "removes_cursor")(prefix, suffix):
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict
+import functools
 
 try:
     from aiolimiter import AsyncLimiter  # type: ignore
@@ -16,15 +16,14 @@ except Exception:  # soft fallback until dependency is installed
             return False
 
 
-user_limiters: Dict[str, AsyncLimiter] = {}
-
-
+@functools.lru_cache(maxsize=4096)
 def limiter_for(user_id: str) -> AsyncLimiter:
-    """Return a per-user AsyncLimiter (3 req/s with burst of 3)."""
-    lim = user_limiters.get(user_id)
-    if lim is None:
-        lim = AsyncLimiter(3, 1)
-        user_limiters[user_id] = lim
-    return lim
+    """
+    Return a per-user AsyncLimiter (3 req/s with burst of 3).
+
+    Bounded LRU: the least recently seen users are evicted past 4096 entries,
+    which only resets their bucket the next time they show up.
+    """
+    return AsyncLimiter(3, 1)
 
 
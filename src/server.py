@@ -4,22 +4,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import Any
 import asyncio
+import functools
 from pydantic import BaseModel
 import logging
+import dotenv
 from .settings import Settings
 from .prediction_services.inline_autocomplete import InlineAutoCompleter
-from .utils import init_http_client, close_http_client, stable_hash
-from fastapi.responses import HTMLResponse
+from .utils import Result, init_http_client, close_http_client, json_dumps, new_hasher
+from fastapi.responses import HTMLResponse, Response
 from fastapi import Request
 
 from .singleflight import SingleFlight
 from .latest_only import LatestOnly
 from .rate_limit import limiter_for
-from .cache import suggest_cache
+from .cache import suggest_cache, suggest_cache_neg
+
+# Per-call deadline for upstream predictions; the shared HTTP client uses the same
+# budget so a request abandoned by wait_for doesn't keep holding a pooled connection.
+_UPSTREAM_TIMEOUT_S = 12.0
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_http_client()
+    await init_http_client(timeout=_UPSTREAM_TIMEOUT_S)
     try:
         yield
     finally:
@@ -31,6 +38,8 @@ logger = logging.getLogger("ntp")
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger.setLevel(logging.INFO)
+# Level is set once above and not changed at runtime; snapshot the check
+_INFO = logger.isEnabledFor(logging.INFO)
 
 # Enable simple, permissive CORS for local testing UI
 app.add_middleware(
@@ -41,12 +50,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Load .env once at startup, before any client reads its key from the environment.
+dotenv.load_dotenv()
+
 # You can load from env or a file; here we use defaults for brevity.
 settings = Settings()
 service = InlineAutoCompleter.from_settings(settings)
 _sf = SingleFlight()
 _latest_only = LatestOnly()
 
+# Settings are fixed for the process lifetime, so resolve the active target once.
+_PROVIDER_TARGETS = {
+    "openai": (settings.openai.model, settings.openai.url),
+    "openrouter": (settings.openrouter.model, settings.openrouter.url),
+    "gemini": (settings.gemini.model, "google-genai"),
+}
+_PROVIDER = settings.api_provider
+_MODEL, _URL = _PROVIDER_TARGETS.get(_PROVIDER, ("unknown", ""))
+_KEY_PREFIX = f"{_PROVIDER}:{_MODEL}:"
 
 class PredictRequest(BaseModel):
     prefix: str
@@ -57,69 +78,74 @@ class PredictResponse(BaseModel):
     completion: str
 
 
-def _req_key(provider: str, model: str, prefix: str, suffix: str) -> str:
-    tail = prefix[-200:]
-    head = suffix[:60]
-    return f"{provider}:{model}:{stable_hash(tail+'\u241f'+head)}"  # U+241F SYMBOL FOR UNIT SEPARATOR
+_KEY_SEP = "\u241f".encode("utf-8")  # U+241F SYMBOL FOR UNIT SEPARATOR
+
+
+def _req_key(prefix: str, suffix: str) -> str:
+    # Feed the slices straight into the hasher instead of joining them first
+    h = new_hasher()
+    h.update(prefix[-200:].encode("utf-8"))
+    h.update(_KEY_SEP)
+    h.update(suffix[:60].encode("utf-8"))
+    return _KEY_PREFIX + h.hexdigest()
+
 
+def _completion_response(text: str) -> Response:
+    # Encode directly (orjson when installed) instead of building and dumping a PredictResponse
+    return Response(content=json_dumps({"completion": text}), media_type="application/json")
 
-@app.post("/predict", response_model=PredictResponse)
+
+async def _fetch_once(p: str, s: str) -> Result[str]:
+    # hard timeout per call; avoids hung upstreams dragging UI responsiveness
+    return await asyncio.wait_for(service.fetch_predictions(p, s), timeout=_UPSTREAM_TIMEOUT_S)
+
+
+async def _run_prediction(user: str, key: str, req_prefix: str, req_suffix: str, p: str, s: str) -> str:
+    """LatestOnly runner for one /predict call, bound per request with functools.partial."""
+    # LatestOnly may hand this runner a newer input; only rehash in that case
+    k = key if (p is req_prefix and s is req_suffix) else _req_key(p, s)
+    if _INFO:
+        logger.info("latest-only run user=%s key=%s", user, k)
+
+    res: Result[str] = await _sf.do(k, functools.partial(_fetch_once, p, s))
+    res_ok = res.is_ok()
+    text = res.value if res_ok else ""
+    if _INFO:
+        if res_ok:
+            logger.info("api ok user=%s key=%s len=%d", user, k, len(text))
+        else:
+            logger.info("api err user=%s key=%s err=%s", user, k, res.error)
+    if text:
+        suggest_cache[k] = text
+    elif res_ok:
+        suggest_cache_neg[k] = True
+    return text
+
+
+@app.post("/predict", responses={200: {"model": PredictResponse}})
 async def predict(req: PredictRequest, request: Request):
     user = request.headers.get("X-Client-Id") or (request.client.host if request.client else "anon")
-    provider = settings.api_provider
-    if provider == "openai":
-        model = settings.openai.model
-    elif provider == "openrouter":
-        model = settings.openrouter.model
-    elif provider == "gemini":
-        model = settings.gemini.model
-    else:
-        model = "unknown"
-
     async with limiter_for(user):
-        key = _req_key(provider, model, req.prefix, req.suffix)
-        if logger.isEnabledFor(logging.INFO):
-            logger.info("/predict user=%s key=%s tail=%d head=%d", user, key, len(req.prefix[-200:]), len(req.suffix[:60]))
-
-        cached = None
-        try:
-            cached = suggest_cache.get(key)  # type: ignore[attr-defined]
-        except Exception:
-            # cache stub may not support .get in the same way; best-effort
-            cached = suggest_cache[key] if key in suggest_cache else None  # type: ignore[index]
-        if cached is not None and isinstance(cached, str) and cached != "":
-            if logger.isEnabledFor(logging.INFO):
+        key = _req_key(req.prefix, req.suffix)
+        if _INFO:
+            logger.info("/predict user=%s key=%s tail=%d head=%d", user, key, min(len(req.prefix), 200), min(len(req.suffix), 60))
+
+        # Only non-empty completion strings are ever stored
+        cached = suggest_cache.get(key)
+        if cached:
+            if _INFO:
                 logger.info("cache hit user=%s key=%s", user, key)
-            return PredictResponse(completion=cached)
-
-        async def runner(p: str, s: str) -> str:
-            k = _req_key(provider, model, p, s)
-            if logger.isEnabledFor(logging.INFO):
-                logger.info("latest-only run user=%s key=%s", user, k)
-
-            async def call():
-                # hard timeout per call; avoids hung upstreams dragging UI responsiveness
-                return await asyncio.wait_for(service.fetch_predictions(p, s), timeout=12.0)
-
-            res = await _sf.do(k, call)
-            text = res.value if hasattr(res, "is_ok") and res.is_ok() else ""
-            if logger.isEnabledFor(logging.INFO):
-                if getattr(res, "is_ok", lambda: False)():
-                    logger.info("api ok user=%s key=%s len=%d", user, k, len(text))
-                else:
-                    logger.info("api err user=%s key=%s err=%s", user, k, getattr(res, "error", None))
-            # cache set best-effort
-            if text:
-                try:
-                    suggest_cache[k] = text  # type: ignore[index]
-                except Exception:
-                    pass
-            return text
+            return _completion_response(cached)
+        if key in suggest_cache_neg:
+            if _INFO:
+                logger.info("negative cache hit user=%s key=%s", user, key)
+            return _completion_response("")
 
+        runner = functools.partial(_run_prediction, user, key, req.prefix, req.suffix)
         text = await _latest_only.run(user, req.prefix, req.suffix, runner)
-        if logger.isEnabledFor(logging.INFO):
+        if _INFO:
             logger.info("/predict done user=%s key=%s len=%d", user, key, len(text))
-        return PredictResponse(completion=text)
+        return _completion_response(text)
 
 
 class HealthResponse(BaseModel):
@@ -137,40 +163,34 @@ class ConfigResponse(BaseModel):
     model_options: dict[str, Any]
 
 
-@app.get("/health", response_model=HealthResponse)
+# Settings don't change at runtime, so /config is serialized once
+_CONFIG_JSON = ConfigResponse(
+    api_provider=_PROVIDER,
+    model=_MODEL,
+    url=_URL,
+    streaming=settings.enable_streaming,
+    stream_min_chars_before_emit=settings.stream_min_chars_before_emit,
+    stream_emit_on_boundary=settings.stream_emit_on_boundary,
+    stream_throttle_ms=settings.stream_throttle_ms,
+    model_options=settings.model_options.model_dump(),
+).model_dump_json().encode("utf-8")
+
+
+_HEALTH_OK = b'{"status":"ok"}'
+
+
+@app.get("/health", responses={200: {"model": HealthResponse}})
 async def health():
-    return HealthResponse(status="ok")
+    return Response(content=_HEALTH_OK, media_type="application/json")
 
 
 @app.get("/config", response_model=ConfigResponse)
 async def config():
-    if settings.api_provider == "openai":
-        model = settings.openai.model
-        url = settings.openai.url
-    elif settings.api_provider == "openrouter":
-        model = settings.openrouter.model
-        url = settings.openrouter.url
-    elif settings.api_provider == "gemini":
-        model = settings.gemini.model
-        url = "google-genai"
-    else:
-        model = "unknown"
-        url = ""
-    return ConfigResponse(
-        api_provider=settings.api_provider,
-        model=model,
-        url=url,
-        streaming=settings.enable_streaming,
-        stream_min_chars_before_emit=settings.stream_min_chars_before_emit,
-        stream_emit_on_boundary=settings.stream_emit_on_boundary,
-        stream_throttle_ms=settings.stream_throttle_ms,
-        model_options=settings.model_options.model_dump(),
-    )
+    return Response(content=_CONFIG_JSON, media_type="application/json")
 
 
-@app.get("/ui", response_class=HTMLResponse)
-async def ui():
-    html = r"""<!doctype html>
+# Static page: encode once at import so /ui only writes the cached bytes
+_UI_HTML_BYTES = r"""<!doctype html>
 <meta charset="utf-8" />
 <title>Inline Autocomplete — Smoke Test</title>
 <style>
@@ -420,6 +440,24 @@ box.addEventListener('keydown', (e) => {
 
 syncScroll();
 renderGhost();
-</script>"""
-    return HTMLResponse(content=html)
+</script>""".encode("utf-8")
 
+
+@app.get("/ui", response_class=HTMLResponse)
+async def ui():
+    return HTMLResponse(content=_UI_HTML_BYTES)
+
+
+if __name__ == "__main__":
+    # python -m src.server. uvicorn's default loop/http selection already picks uvloop
+    # and httptools, which ship with uvicorn[standard] (uvloop is not available on
+    # Windows/PyPy, where it falls back to asyncio). A single worker keeps the
+    # in-process caches, SingleFlight and LatestOnly state shared.
+    import os
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+    )
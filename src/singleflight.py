@@ -1,40 +1,94 @@
 from __future__ import annotations
 import asyncio
-from typing import Awaitable, Callable, Dict, Any
+from typing import Awaitable, Callable, Dict, Hashable, List, Any
 import logging
 
 
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+class _Slot:
+    """Shared outcome of one in-flight call; joiners wait on ``event`` then read it."""
+
+    __slots__ = ("event", "result", "exc")
+
+    def __init__(self) -> None:
+        self.event = asyncio.Event()
+        self.result: Any = None
+        self.exc: BaseException | None = None
+
+
 class SingleFlight:
     """
     Collapse identical concurrent requests so work runs only once per key.
-    Subsequent awaiters receive the same result or exception.
+    Subsequent awaiters receive the same result or exception. Keys may be any
+    hashable (e.g. a tuple of parts), so callers need not format a string key.
+
+    Finished slots are kept on a small freelist and reused for later keys.
     """
 
+    _POOL_MAX = 64
+    # Dicts never shrink their table; rebuild once idle after holding this many keys
+    _REBUILD_PEAK = 1024
+
     def __init__(self) -> None:
-        self._futures: Dict[str, asyncio.Future] = {}
-        self._logger = logging.getLogger("ntp")
-
-    async def do(self, key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
-        fut = self._futures.get(key)
-        if fut is not None:
-            if self._logger.isEnabledFor(logging.INFO):
-                self._logger.info("singleflight join key=%s", key)
-            return await fut
-
-        loop = asyncio.get_event_loop()
-        fut = loop.create_future()
-        self._futures[key] = fut
-        if self._logger.isEnabledFor(logging.INFO):
-            self._logger.info("singleflight leader key=%s", key)
+        self._inflight: Dict[Hashable, _Slot] = {}
+        logger = logging.getLogger("ntp")
+        # Resolved once: the level is configured before the instance is created
+        self._log_info = logger.info if logger.isEnabledFor(logging.INFO) else _noop
+        self._pool: List[_Slot] = []
+        # Events bind to the loop they are first awaited on, so the pool is per loop
+        self._pool_loop: asyncio.AbstractEventLoop | None = None
+        self._peak = 0
+
+    async def do(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        inflight, log_info, pool = self._inflight, self._log_info, self._pool
+        loop = asyncio.get_running_loop()
+        slot = pool.pop() if pool and self._pool_loop is loop else _Slot()
+        # Test-and-set in one probe: whoever installs its slot first leads
+        existing = inflight.setdefault(key, slot)
+        if existing is not slot:
+            if len(pool) < self._POOL_MAX:
+                pool.append(slot)  # never published, still clean
+            log_info("singleflight join key=%s", key)
+            # A cancelled joiner only abandons its own wait; the slot is unaffected
+            await existing.event.wait()
+            exc = existing.exc
+            if exc is None:
+                return existing.result
+            if isinstance(exc, asyncio.CancelledError):
+                # The leader was cancelled, not us: run the call ourselves (or join whoever
+                # got there first) instead of failing with someone else's cancellation
+                return await self.do(key, coro_factory)
+            raise exc
+
+        if len(inflight) > self._peak:
+            self._peak = len(inflight)
+        log_info("singleflight leader key=%s", key)
 
         try:
-            result = await coro_factory()
-            fut.set_result(result)
-            return result
-        except Exception as e:  # pragma: no cover - propagate exceptions too
-            fut.set_exception(e)
+            slot.result = await coro_factory()
+            return slot.result
+        except BaseException as e:
+            # Includes cancellation, so joiners are released and can take over the call
+            slot.exc = e
             raise
         finally:
-            self._futures.pop(key, None)
-
+            inflight.pop(key, None)
+            if not inflight and self._peak > self._REBUILD_PEAK:
+                self._inflight = {}
+                self._peak = 0
+            slot.event.set()
+            if len(pool) < self._POOL_MAX:
+                # Queued behind the joiners' wakeups, so they read the slot before reuse
+                loop.call_soon(self._recycle, slot, loop)
 
+    def _recycle(self, slot: _Slot, loop: asyncio.AbstractEventLoop) -> None:
+        if self._pool_loop is not loop:
+            self._pool.clear()
+            self._pool_loop = loop
+        if len(self._pool) < self._POOL_MAX:
+            slot.event.clear()
+            slot.result = slot.exc = None
+            self._pool.append(slot)
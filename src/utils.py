@@ -1,22 +1,46 @@
 from __future__ import annotations
-import random
-from typing import Any, Dict, Generic, TypeVar, Callable
+import os
+from typing import Any, AsyncIterator, Dict, Generic, TypeVar, Callable
 import hashlib
+from abc import ABC, abstractmethod
+import json
 import httpx
 try:
     import h2  # type: ignore
     _HAS_H2 = True
 except Exception:
     _HAS_H2 = False
+try:
+    import orjson  # type: ignore
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    json_loads = orjson.loads
+except Exception:  # stdlib fallback when orjson is not installed
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    json_loads = json.loads  # accepts bytes as well
+try:
+    import xxhash  # type: ignore
+
+    new_hasher = xxhash.xxh3_64
+except Exception:  # stdlib fallback when xxhash is not installed
+    def new_hasher() -> Any:
+        return hashlib.blake2b(digest_size=8)
 
 T = TypeVar("T")
 
+# How long a successful check_config() live probe is trusted before re-querying
+CONFIG_CHECK_TTL_S = 60.0
 
-class Result(Generic[T]):
-    __slots__ = ("_ok", "_value", "_error")
 
-    def __init__(self, ok: bool, value: T | None = None, error: Exception | None = None):
-        self._ok, self._value, self._error = ok, value, error
+class Result(ABC, Generic[T]):
+    """Success/failure value; build with ``ok()`` / ``err()``, which return ``_Ok`` / ``_Err``."""
+
+    __slots__ = ()
+    _ok: bool
 
     def is_ok(self) -> bool:
         return self._ok
@@ -24,50 +48,97 @@ class Result(Generic[T]):
     def is_err(self) -> bool:
         return not self._ok
 
+    @property
+    @abstractmethod
+    def value(self) -> T: ...
+
+    @property
+    @abstractmethod
+    def error(self) -> Exception: ...
+
+    @abstractmethod
+    def map(self, fn: Callable[[T], T]) -> "Result[T]": ...
+
+
+class _Ok(Result[T]):
+    __slots__ = ("_value",)
+    _ok = True
+
+    def __init__(self, value: T) -> None:
+        self._value = value
+
     @property
     def value(self) -> T:
-        if not self._ok:
-            raise self._error  # type: ignore[misc]
-        return self._value  # type: ignore[return-value]
+        return self._value
 
     @property
     def error(self) -> Exception:
-        if self._ok:
-            raise RuntimeError("No error")
-        return self._error  # type: ignore[return-value]
+        raise RuntimeError("No error")
 
     def map(self, fn: Callable[[T], T]) -> "Result[T]":
-        return ok(fn(self._value)) if self._ok else self  # type: ignore[arg-type]
+        return _Ok(fn(self._value))
+
+
+class _Err(Result[Any]):
+    __slots__ = ("_error",)
+    _ok = False
+
+    def __init__(self, error: Exception) -> None:
+        self._error = error
+
+    @property
+    def value(self) -> Any:
+        raise self._error
+
+    @property
+    def error(self) -> Exception:
+        return self._error
+
+    def map(self, fn: Callable[[Any], Any]) -> "Result[Any]":
+        return self
 
 
 def ok(value: T) -> Result[T]:
-    return Result(True, value=value)
+    return _Ok(value)
 
 
 def err(error: Exception) -> Result[Any]:
-    return Result(False, error=error)
+    return _Err(error)
 
 
 def generate_random_string(n: int) -> str:
-    chars = "0123456789abcdef"
-    return "".join(random.choice(chars) for _ in range(n))
+    # Random lowercase hex of length n; one C-level call instead of n random.choice()s
+    return os.urandom((n + 1) // 2).hex()[:n]
 
 
+# Shared result for empty-body successes; it carries no exception, so sharing is safe.
+# Errors are never interned: re-raising one exception object grows its traceback.
+_OK_NONE = ok(None)
+_ERR_500_MSG = "API returned status code 500. Please try again later."
+# Never mutated; httpx copies request headers into its own structure
+_DEFAULT_HEADERS = {"Content-Type": "application/json"}
+
 _HTTP_CLIENT: httpx.AsyncClient | None = None
 
 
 async def init_http_client(timeout: float = 25.0) -> None:
+    """Create the process-wide pooled client shared by all HTTP API clients."""
     global _HTTP_CLIENT
+    # No await between the check and the assignment, so concurrent first callers can't
+    # both build a client. Guard with an asyncio.Lock if this ever needs to await.
     if _HTTP_CLIENT is None:
-        transport = httpx.AsyncHTTPTransport(retries=2)
-        _HTTP_CLIENT = httpx.AsyncClient(timeout=timeout, transport=transport, http2=_HAS_H2)
+        limits = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+        transport = httpx.AsyncHTTPTransport(retries=2, http2=_HAS_H2, limits=limits)
+        # http2/limits must be set on the transport: httpx ignores them on the client when one is given
+        _HTTP_CLIENT = httpx.AsyncClient(timeout=httpx.Timeout(timeout, connect=5.0), transport=transport)
 
 
 async def get_http_client() -> httpx.AsyncClient:
-    if _HTTP_CLIENT is None:
-        await init_http_client()
-    assert _HTTP_CLIENT is not None
-    return _HTTP_CLIENT
+    client = _HTTP_CLIENT
+    if client is not None:
+        return client
+    await init_http_client()
+    return _HTTP_CLIENT  # type: ignore[return-value]
 
 
 async def close_http_client() -> None:
@@ -82,40 +153,58 @@ async def close_http_client() -> None:
 async def make_api_request(
     url: str,
     method: str,
-    body: Dict[str, Any],
+    body: Dict[str, Any] | bytes,
     headers: Dict[str, str] | None = None,
     timeout: float = 30.0,
 ) -> Result[Any]:
-    headers = headers or {"Content-Type": "application/json"}
+    """Send a JSON request; ``body`` may be a dict or an already-serialized payload."""
+    headers = headers or _DEFAULT_HEADERS
     try:
-        client = await get_http_client()
-        resp = await client.request(method, url, json=body, headers=headers)
+        # Read the global directly once initialized; skips a coroutine per request
+        client = _HTTP_CLIENT or await get_http_client()
+        content = body if isinstance(body, bytes) else json_dumps(body)
+        resp = await client.request(method, url, content=content, headers=headers)
         if resp.status_code >= 500:
-            return err(RuntimeError("API returned status code 500. Please try again later."))
+            return err(RuntimeError(_ERR_500_MSG))
         json_body = None
-        try:
-            json_body = resp.json()
-        except Exception:
-            pass
+        # Only parse bodies that claim to be JSON; parse the raw bytes without a str decode
+        if "json" in resp.headers.get("content-type", ""):
+            try:
+                json_body = json_loads(resp.content)
+            except Exception:
+                pass
         if resp.status_code >= 400:
-            msg = f"API returned status code {resp.status_code}"
+            maybe = None
             if isinstance(json_body, dict):
-                maybe = (
-                    json_body.get("error", {}).get("message")
-                    if isinstance(json_body.get("error"), dict)
-                    else json_body.get("error")
-                )
-                if maybe:
-                    msg += f": {maybe}"
+                e = json_body.get("error")
+                maybe = e.get("message") if isinstance(e, dict) else e
+            msg = (
+                f"API returned status code {resp.status_code}: {maybe}"
+                if maybe
+                else f"API returned status code {resp.status_code}"
+            )
             return err(RuntimeError(msg))
-        return ok(json_body)
+        return _OK_NONE if json_body is None else ok(json_body)
     except Exception as e:
         return err(e)
 
 
-
-def stable_hash(text: str) -> str:
-    """Return a short, stable hex hash for cache/singleflight keys."""
-    h = hashlib.sha1(text.encode("utf-8"))
-    return h.hexdigest()[:16]
-
+async def aiter_sse_data(resp: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield the stripped payload of each SSE ``data:`` line as raw bytes.
+
+    Scans the byte stream directly instead of going through ``aiter_lines``,
+    so no str is decoded for lines that are not ``data:`` events.
+    """
+    buf = bytearray()
+    # No chunk_size: httpx would otherwise hold bytes back until a full chunk arrives.
+    async for chunk in resp.aiter_bytes():
+        buf += chunk
+        start = 0
+        while (i := buf.find(b"\n", start)) != -1:
+            if buf.startswith(b"data: ", start, i):
+                yield bytes(buf[start + 6:i]).strip()
+            start = i + 1
+        if start:
+            del buf[:start]
+    if buf.startswith(b"data: "):
+        yield bytes(buf[6:]).strip()
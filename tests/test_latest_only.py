@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from src.latest_only import LatestOnly
+
+
+class LatestOnlyTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.lo = LatestOnly()
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def fn(self, prefix: str, suffix: str) -> str:
+        self.calls.append(prefix)
+        if prefix == "a":
+            await self.release.wait()
+        return "R" + prefix
+
+    async def start(self, *prefixes: str):
+        """Start one caller per prefix, letting each reach its wait before the next."""
+        tasks = []
+        for p in prefixes:
+            tasks.append(asyncio.create_task(self.lo.run("u", p, "", self.fn)))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)  # let superseded callers move on to the newer future
+        return tasks
+
+    async def test_cancelling_superseded_caller_keeps_newer_caller_alive(self):
+        a, b, c = await self.start("a", "b", "c")
+
+        b.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        results = await asyncio.gather(a, b, c, return_exceptions=True)
+        self.assertEqual(results[0], "Ra")
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(results[2], "Rc")
+        self.assertEqual(self.calls, ["a", "c"])
+
+    async def test_cancelling_newest_caller_keeps_superseded_caller_alive(self):
+        a, b, c = await self.start("a", "b", "c")
+
+        c.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        results = await asyncio.wait_for(asyncio.gather(a, b, c, return_exceptions=True), 1)
+        self.assertEqual(results[0], "Ra")
+        self.assertEqual(results[1], "Rc")
+        self.assertIsInstance(results[2], asyncio.CancelledError)
+        self.assertEqual(self.calls, ["a", "c"])
+
+    async def test_cancelling_runner_hands_drain_to_waiting_callers(self):
+        a, b, c = await self.start("a", "b", "c")
+
+        a.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(a, b, c, return_exceptions=True), 1)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1:], ["Rc", "Rc"])
+        self.assertEqual(self.calls, ["a", "c"])
+
+    async def test_cancelled_pending_input_is_not_run(self):
+        a, b = await self.start("a", "b")
+
+        b.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        results = await asyncio.gather(a, b, return_exceptions=True)
+        self.assertEqual(results[0], "Ra")
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(self.calls, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
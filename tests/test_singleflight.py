@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+
+from src.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_one_call(self):
+        sf = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(*(sf.do("k", work) for _ in range(5)))
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(calls, 1)
+
+    async def test_cancelled_joiner_does_not_affect_others(self):
+        sf = SingleFlight()
+
+        async def work() -> int:
+            await asyncio.sleep(0.01)
+            return 42
+
+        tasks = [asyncio.create_task(sf.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(results[0], 42)
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(results[2], 42)
+
+    async def test_joiners_take_over_when_leader_is_cancelled(self):
+        sf = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        tasks = [asyncio.create_task(sf.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1:], [42, 42])
+        # One cancelled attempt plus a single retried call shared by both joiners
+        self.assertEqual(calls, 2)
+
+    async def test_leader_exception_reaches_joiners(self):
+        sf = SingleFlight()
+
+        async def work() -> int:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(sf.do("k", work) for _ in range(3)), return_exceptions=True)
+        for r in results:
+            self.assertIsInstance(r, ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()